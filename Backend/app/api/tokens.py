@@ -1,72 +1,167 @@
 import asyncio
 import logging
 import os
-from typing import List, Optional
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Dict, Final, List, Optional, Tuple
 
+from cachetools import TTLCache
 from fastapi import HTTPException, APIRouter
 from solana.rpc.commitment import Confirmed
 from solana.rpc.types import TxOpts
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
-from solana.rpc.api import Client
+from solana.rpc.async_api import AsyncClient
 from solders.rpc.responses import RpcPerfSample
-from spl.token.client import Token
+from spl.token.async_client import AsyncToken
 from spl.token.constants import TOKEN_PROGRAM_ID
 
 from ..core.config import SOLANA_API_ENDPOINT
+from ..core.rpc_batch import rpc_batch, rpc_request
+from ..core.rpc_http import http_client
 from ..models import CustomToken, TokenX
 
 
 logger = logging.getLogger(__name__)
+
+# Token program id as it appears in raw JSON-RPC account keys
+TOKEN_PROGRAM_ID_STR: Final[str] = str(TOKEN_PROGRAM_ID)
+
 # Initialize Solana Testnet client
-client = Client(SOLANA_API_ENDPOINT, timeout=120)
+client = AsyncClient(SOLANA_API_ENDPOINT, timeout=120)
+# Route solana-py requests through the shared HTTP/2 connection pool
+client._provider.session = http_client
 
-# Initialize Router
-router = APIRouter()
+# Maximum number of in-flight getMultipleAccounts requests
+METADATA_CONCURRENCY = 32
 
+# Mint account size and max keys per getMultipleAccounts request
+MINT_ACCOUNT_SIZE = 82
+MULTIPLE_ACCOUNTS_LIMIT = 100
 
-async def get_token_metadata(
-        token_address: Pubkey
-) -> Optional[dict]:
-    """Helper function to get token metadata from on-chain data"""
-    try:
-        # Create a temporary keypair for reading
-        seed_bytes = os.urandom(32)
-        temp_keypair = Keypair.from_seed(seed_bytes)
+# Airdrop limits: seconds to wait for confirmation, concurrent requests
+AIRDROP_CONFIRM_TIMEOUT = 60
+_airdrop_semaphore = asyncio.Semaphore(8)
 
-        # Get token account info
-        token = Token(
-            client,
-            token_address,
-            TOKEN_PROGRAM_ID,
-            temp_keypair
-        )
+# Token metadata cache keyed by mint address, None for non-mint accounts
+_meta_cache: TTLCache = TTLCache(maxsize=10_000, ttl=120)
+_MISSING = object()
 
-        # Get mint info
-        mint_account = client.get_account_info(token_address)
-        if not mint_account.value:
-            return None
+# Full sorted trending list shared by every limit: (computed at, tokens)
+TRENDING_CACHE_TTL = 10
+_trending_cache: Optional[Tuple[float, List[TokenX]]] = None
+_trending_lock = asyncio.Lock()
 
-        # Get token supply
-        mint_info = token.get_mint_info()
-        if not mint_info:
-            return None
+# Initialize Router
+router = APIRouter()
 
-        return {
-            "address": str(token_address),
-            "supply": mint_info.supply,
-            "decimals": mint_info.decimals
-        }
-    except Exception:
-        return None
+
+@lru_cache(maxsize=4096)
+def parse_pubkey(address: str) -> Pubkey:
+    """Parse a base58 address, cached for repeatedly requested keys"""
+    return Pubkey.from_string(address)
+
+
+def decode_mint(address: str, data: bytes) -> dict:
+    """Decode supply and decimals from raw SPL token mint account data"""
+    return {
+        "address": address,
+        "supply": int.from_bytes(data[36:44], "little"),
+        "decimals": data[44]
+    }
+
+
+async def fetch_token_metadata_chunk(
+        addresses: List[str]
+) -> Dict[str, Optional[dict]]:
+    """Fetch up to 100 mint accounts with a single getMultipleAccounts call"""
+    response = await client.get_multiple_accounts(
+        [Pubkey.from_string(address) for address in addresses],
+        encoding="base64"
+    )
+
+    metadata = {}
+    for address, account in zip(addresses, response.value):
+        if (
+                account is None or
+                account.owner != TOKEN_PROGRAM_ID or
+                len(account.data) != MINT_ACCOUNT_SIZE
+        ):
+            metadata[address] = None
+        else:
+            metadata[address] = decode_mint(address, account.data)
+    return metadata
+
+
+async def get_token_metadata_batch(
+        addresses: List[str]
+) -> Dict[str, dict]:
+    """Get metadata for the given token mints, served from cache when
+    available. Addresses that are not token mints are omitted."""
+    metadata = {}
+    missing = []
+    for address in addresses:
+        cached = _meta_cache.get(address, _MISSING)
+        if cached is _MISSING:
+            missing.append(address)
+        else:
+            metadata[address] = cached
+
+    semaphore = asyncio.Semaphore(METADATA_CONCURRENCY)
+
+    async def guarded(chunk: List[str]) -> Dict[str, Optional[dict]]:
+        async with semaphore:
+            try:
+                return await fetch_token_metadata_chunk(chunk)
+            except Exception:
+                logger.exception(
+                    f"Failed to fetch token metadata for {len(chunk)} "
+                    f"accounts starting at {chunk[0]}"
+                )
+                return {}
+
+    chunks = [
+        missing[i:i + MULTIPLE_ACCOUNTS_LIMIT]
+        for i in range(0, len(missing), MULTIPLE_ACCOUNTS_LIMIT)
+    ]
+    for fetched in await asyncio.gather(*[guarded(c) for c in chunks]):
+        _meta_cache.update(fetched)
+        metadata.update(fetched)
+
+    return {
+        address: token_info for address, token_info in metadata.items()
+        if token_info
+    }
 
 
 @router.get("/trending", response_model=List[TokenX])
 async def get_trending_tokens(limit: int = 5):
-    """Get list of trending tokens based on recent transaction volume"""
+    """Get list of trending tokens, cached for a few seconds"""
+    global _trending_cache
+
+    cached = _trending_cache
+    if cached and time.monotonic() - cached[0] < TRENDING_CACHE_TTL:
+        return cached[1][:limit]
+
+    # Concurrent misses wait for a single upstream computation
+    async with _trending_lock:
+        cached = _trending_cache
+        if cached and time.monotonic() - cached[0] < TRENDING_CACHE_TTL:
+            return cached[1][:limit]
+
+        tokens = await fetch_trending_tokens()
+        _trending_cache = (time.monotonic(), tokens)
+
+    return tokens[:limit]
+
+
+async def fetch_trending_tokens() -> List[TokenX]:
+    """Get all recently active tokens sorted by transaction volume"""
     try:
         # Fetch recent performance samples
-        recent_blocks = client.get_recent_performance_samples(limit=5)
+        recent_blocks = await client.get_recent_performance_samples(limit=5)
         performance_samples: List[RpcPerfSample] = recent_blocks.value
 
         if not performance_samples:
@@ -77,38 +172,52 @@ async def get_trending_tokens(limit: int = 5):
 
         # Extract slot numbers
         slots = [sample.slot for sample in performance_samples[:5]]
-        token_transactions = {}
 
-        for slot in slots:
-            block_info = client.get_block(slot)
-            if not hasattr(block_info, "value") or not block_info.value:
+        # Fetch all blocks in a single JSON-RPC batch
+        block_requests = [
+            rpc_request(i, "getBlock", [
+                slot,
+                {
+                    "encoding": "json",
+                    "maxSupportedTransactionVersion": 0,
+                    "transactionDetails": "full",
+                    "rewards": False
+                }
+            ])
+            for i, slot in enumerate(slots)
+        ]
+        block_responses = await rpc_batch(block_requests)
+
+        # Count token program account keys across all blocks
+        account_counts = Counter()
+        for slot, block_info in zip(slots, block_responses):
+            block = block_info.get("result")
+            if not block:
                 logger.warning(
                     f"Skipping block {slot} due to missing transaction data"
                 )
                 continue
 
-            for tx in block_info.value.transactions:
-                if (
-                        str(TOKEN_PROGRAM_ID) in
-                        [str(key) for key in tx.transaction.message.account_keys]
-                ):
-                    for account in tx.transaction.message.account_keys:
-                        token_info = await get_token_metadata(account)
-                        if not token_info:
-                            continue
-
-                        if str(account) not in token_transactions:
-                            token_transactions[str(account)] = {
-                                "count": 0,
-                                "metadata": token_info,
-                            }
-                        token_transactions[str(account)]["count"] += 1
+            for tx in block.get("transactions", []):
+                account_keys = tx["transaction"]["message"]["accountKeys"]
+                if TOKEN_PROGRAM_ID_STR in account_keys:
+                    account_counts.update(account_keys)
+
+        # Resolve metadata once per unique account
+        metadata = await get_token_metadata_batch(list(account_counts))
+        token_transactions = {
+            account: {
+                "count": account_counts[account],
+                "metadata": token_info,
+            }
+            for account, token_info in metadata.items()
+        }
 
         # Sort tokens by transaction count
         sorted_tokens = sorted(
             token_transactions.items(),
             key=lambda x: x[1]["count"], reverse=True
-        )[:limit]
+        )
 
         tokens = [
             TokenX(
@@ -124,38 +233,56 @@ async def get_trending_tokens(limit: int = 5):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def request_airdrop(
-        clientt, wallet_address: str, lamports: int = 1000000000
+@asynccontextmanager
+async def airdrop_slot():
+    """Limit the number of airdrops in flight at once"""
+    async with _airdrop_semaphore:
+        yield
+
+
+async def request_airdrop(
+        clientt, pubkey: Pubkey, lamports: int = 1000000000
 ):
     try:
-        # Convert string address to Pubkey
-        pubkey = Pubkey.from_string(wallet_address)
-
         # Request airdrop with proper parameters
         opts = TxOpts(skip_preflight=False, preflight_commitment=Confirmed)
 
-        # Make the airdrop request
-        response =  clientt.request_airdrop(
-            pubkey,
-            lamports,
-            # opts=opts
-        )
-
-        if not response.value:
-            raise HTTPException(
-                status_code=500,
-                detail="Airdrop request failed - "
-                       "no transaction signature returned"
+        # Hold a slot for the whole airdrop, including the confirmation wait
+        async with airdrop_slot():
+            # Make the airdrop request
+            response = await clientt.request_airdrop(
+                pubkey,
+                lamports,
+                # opts=opts
             )
 
-        # Wait for transaction confirmation
-        clientt.confirm_transaction(
-            response.value,
-            commitment=Confirmed
-        )
+            if not response.value:
+                raise HTTPException(
+                    status_code=500,
+                    detail="Airdrop request failed - "
+                           "no transaction signature returned"
+                )
+
+            # Poll signature status until the airdrop is confirmed
+            try:
+                await asyncio.wait_for(
+                    clientt.confirm_transaction(
+                        response.value,
+                        commitment=Confirmed,
+                        sleep_seconds=0.5
+                    ),
+                    timeout=AIRDROP_CONFIRM_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                raise HTTPException(
+                    status_code=504,
+                    detail="Airdrop confirmation timed out"
+                )
 
         return response.value
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Airdrop request failed: {str(e)}")
         raise HTTPException(
@@ -173,38 +300,25 @@ async def create_custom_token(token_data: CustomToken) -> TokenX:
         mint_authority = Keypair.from_seed(seed_bytes)
 
         # Check balance before airdrop
-        balance_before = client.get_balance(mint_authority.pubkey())
+        balance_before = await client.get_balance(mint_authority.pubkey())
         logger.info(
             f"Balance before airdrop: {balance_before.value} lamports"
         )
 
         # Request airdrop
-        airdrop_sig = request_airdrop(
-            client, str(mint_authority.pubkey())
-        )
+        airdrop_sig = await request_airdrop(client, mint_authority.pubkey())
         logger.info(
             f"Airdrop requested with signature: {airdrop_sig}"
         )
 
-        # Wait for confirmation
-        await asyncio.sleep(200)
-
-        # Confirm transaction
-        confirmation = client.confirm_transaction(airdrop_sig)
-        if not confirmation:
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to confirm airdrop transaction"
-            )
-
         # Check balance after airdrop
-        balance_after = client.get_balance(mint_authority.pubkey())
+        balance_after = await client.get_balance(mint_authority.pubkey())
         logger.info(
             f"Balance after airdrop: {balance_after.value} lamports"
         )
 
         # Create the token
-        token = Token.create_mint(
+        token = await AsyncToken.create_mint(
             client,
             mint_authority,
             mint_authority.pubkey(),
@@ -221,6 +335,8 @@ async def create_custom_token(token_data: CustomToken) -> TokenX:
             price=None
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error creating custom token")
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,18 +1,26 @@
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional
 
+import orjson
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from solders.keypair import Keypair
-from solders.pubkey import Pubkey
-from spl.token.client import Token
+from solders.signature import Signature
+from solders.transaction_status import TransactionConfirmationStatus
+from spl.token.async_client import AsyncToken
 from spl.token.constants import TOKEN_PROGRAM_ID
 
 from ..models import (
     WalletCreate, Transaction, WalletBalance,
     TokenBalance, WalletResponse
 )
-from .tokens import client, logger
+from ..core.rpc_batch import rpc_batch_stream, rpc_request
+from ..core.rpc_http import http_client
+from .tokens import TOKEN_PROGRAM_ID_STR, client, logger, parse_pubkey
+
+# Block times are unix timestamps, convert them without local tz lookups
+TZ_UTC = timezone.utc
 
 # Empty dict for in-memory wallet storage
 wallets = {}
@@ -52,7 +60,8 @@ async def create_wallet(wallet_data: WalletCreate):
 @router.get("", response_model=List[WalletResponse])
 async def get_wallets():
     """Get all wallets"""
-    return list(wallets.values())
+    # Stored wallets already match WalletResponse, skip re-validation
+    return ORJSONResponse(list(wallets.values()))
 
 
 @router.get("/{public_key}", response_model=WalletResponse)
@@ -60,7 +69,7 @@ async def get_wallet(public_key: str):
     """Get specific wallet details"""
     if public_key not in wallets:
         raise HTTPException(status_code=404, detail="Wallet not found")
-    return wallets[public_key]
+    return ORJSONResponse(wallets[public_key])
 
 
 @router.post("/{public_key}/tokens")
@@ -73,13 +82,13 @@ async def add_token_to_wallet(public_key: str, token_address: str):
         # Reconstruct keypair from stored private key
         seed_bytes = bytes.fromhex(wallets[public_key]["private_key"])
         wallet_keypair = Keypair.from_seed(seed_bytes)
-        token = Token(
-            client, Pubkey.from_string(token_address),
+        token = AsyncToken(
+            client, parse_pubkey(token_address),
             TOKEN_PROGRAM_ID, wallet_keypair
         )
 
         # Get or create associated token account
-        associated_token_account = token.create_associated_token_account(
+        associated_token_account = await token.create_associated_token_account(
             wallet_keypair.pubkey()
         )
 
@@ -91,13 +100,28 @@ async def add_token_to_wallet(public_key: str, token_address: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def parse_token_balance(account: dict) -> Optional[TokenBalance]:
+    """Build a TokenBalance from a jsonParsed token account,
+    None if the account is malformed"""
+    try:
+        info = account['account']['data']['parsed']['info']
+        return TokenBalance.model_construct(
+            address=info['mint'],
+            balance=info['tokenAmount']['uiAmount'] or 0.0,
+            usd_value=None
+        )
+    except (KeyError, TypeError) as e:
+        logger.error(f"Error parsing token account: {str(e)}")
+        return None
+
+
 @router.get("/{public_key}/balance", response_model=WalletBalance)
 async def get_wallet_balance(public_key: str):
     """Get wallet SOL and token balances"""
     try:
-        wallet_pubkey = Pubkey.from_string(public_key)
+        wallet_pubkey = parse_pubkey(public_key)
         # Get SOL balance
-        response = client.get_balance(wallet_pubkey)
+        response = await client.get_balance(wallet_pubkey)
 
         if response.value is None:
             raise HTTPException(status_code=500, detail="Failed to fetch SOL balance")
@@ -108,9 +132,9 @@ async def get_wallet_balance(public_key: str):
             "method": "getTokenAccountsByOwner",
             "jsonrpc": "2.0",
             "params": [
-                str(wallet_pubkey),
+                public_key,
                 {
-                    "programId": str(TOKEN_PROGRAM_ID)
+                    "programId": TOKEN_PROGRAM_ID_STR
                 },
                 {
                     "encoding": "jsonParsed"
@@ -120,90 +144,161 @@ async def get_wallet_balance(public_key: str):
         }
 
         # Request
-        token_response = client._provider.session.post(
-            client._provider.endpoint_uri,
+        token_response = await http_client.post(
+            "",
             json=request_data,
             headers={"Content-Type": "application/json"}
         )
 
-        token_response_data = token_response.json()
-        token_balances = []
-
-        if (
-                'result' in token_response_data and
-                'value' in token_response_data['result']
-        ):
-            for account in token_response_data['result']['value']:
-                try:
-                    parsed_data = account['account']['data']['parsed']['info']
-                    mint_address = parsed_data['mint']
-                    token_amount = parsed_data['tokenAmount']
-
-                    token_balances.append(TokenBalance(
-                        address=mint_address,
-                        balance=token_amount['uiAmount'],
-                        usd_value=None
-                    ))
-                except (KeyError, TypeError) as e:
-                    logger.error(f"Error parsing token account: {str(e)}")
-                    continue
-
-        return WalletBalance(
+        token_response_data = orjson.loads(token_response.content)
+        token_accounts = token_response_data.get('result', {}).get('value', [])
+
+        token_balances = [
+            token_balance
+            for token_balance in map(parse_token_balance, token_accounts)
+            if token_balance is not None
+        ]
+
+        balance = WalletBalance(
             sol_balance=sol_balance,
             usd_value=None,
             tokens=token_balances
         )
+        return ORJSONResponse(balance.model_dump(mode='json'))
     except Exception as e:
         logger.exception("Error fetching wallet balance")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def transaction_status(signature_info) -> str:
+    """Map a signature's error and confirmation status to a status label"""
+    if signature_info.err is not None:
+        return "failed"
+    if signature_info.confirmation_status in (
+            TransactionConfirmationStatus.Confirmed,
+            TransactionConfirmationStatus.Finalized
+    ):
+        return "confirmed"
+    return "pending"
+
+
+def parse_transaction(
+        signature_info, tx: dict, public_key: str
+) -> Transaction:
+    """Build a Transaction from a jsonParsed getTransaction result"""
+    message = tx["transaction"]["message"]
+    account_keys = [key["pubkey"] for key in message["accountKeys"]]
+    # Parse transaction type and amounts
+    tx_type = \
+        "receive" if account_keys[1] == public_key else "send"
+    # Only some programs are parsed into a dict, e.g. Memo yields a string
+    parsed = message["instructions"][0].get("parsed")
+    instruction_info = parsed.get("info", {}) if isinstance(parsed, dict) else {}
+    amount = instruction_info.get("lamports", 0) / 1e9
+    # Block time may be unavailable for a signature
+    block_time = signature_info.block_time or tx.get("blockTime")
+
+    return Transaction.model_construct(
+        signature=str(signature_info.signature),
+        timestamp=datetime.fromtimestamp(block_time, TZ_UTC)
+        if block_time is not None else None,
+        type=tx_type,
+        amount=amount,
+        token_symbol="SOL",
+        from_address=account_keys[0],
+        to_address=account_keys[1],
+        status=transaction_status(signature_info)
+    )
+
+
 @router.get(
-    "/{public_key}/transactions",response_model=List[Transaction]
+    "/{public_key}/transactions",
+    response_class=StreamingResponse,
+    responses={200: {"model": List[Transaction]}}
 )
 async def get_wallet_transactions(
         public_key: str,
         limit: int = 10,
         before: Optional[str] = None
 ):
-    """Get wallet transaction history"""
+    """Get wallet transaction history, streamed as a JSON array"""
     if public_key not in wallets:
         raise HTTPException(
             status_code=404, detail="Wallet not found"
         )
 
+    try:
+        before_signature = Signature.from_string(before) if before else None
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="Invalid before signature"
+        )
+
     try:
         # Get transaction signatures
-        response = client.get_signatures_for_address(
-            Pubkey.from_string(public_key),
+        response = await client.get_signatures_for_address(
+            parse_pubkey(public_key),
             limit=limit,
-            before=before
+            before=before_signature
         )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        transactions = []
-        for signature_info in response.value:
-            # Get transaction details
-            tx_response = client.get_transaction(signature_info.signature)
-
-            if tx_response.value:
-                tx = tx_response.value
-                # Parse transaction type and amounts
-                tx_type = \
-                    "receive" if tx.transaction.message.is_to_wallet(public_key) \
-                        else "send"
-                amount = tx.transaction.message.instructions[0].data.amount / 1e9
-                # Update the transactions list
-                transactions.append(Transaction(
-                    signature=str(signature_info.signature),
-                    timestamp=datetime.fromtimestamp(signature_info.block_time),
-                    type=tx_type,
-                    amount=amount,
-                    token_symbol="SOL",
-                    from_address=str(tx.transaction.message.account_keys[0]),
-                    to_address=str(tx.transaction.message.account_keys[1]),
-                    status="confirmed" if signature_info.confirmed else "pending"
-                ))
-
-        return transactions
+    signatures = response.value
+    tx_requests = [
+        rpc_request(i, "getTransaction", [
+            str(signature_info.signature),
+            {
+                "encoding": "jsonParsed",
+                "maxSupportedTransactionVersion": 0
+            }
+        ])
+        for i, signature_info in enumerate(signatures)
+    ]
+
+    # Wait for the first batch so an unreachable RPC node is reported
+    # as an error response rather than an empty history
+    batches = rpc_batch_stream(tx_requests)
+    try:
+        first_batch = await anext(batches, None)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        logger.exception("Error fetching wallet transactions")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def stream_transactions():
+        # Emit each batch of transactions as soon as it resolves. A
+        # transport error on a later batch propagates and aborts the
+        # response, so a truncated history is never sent as valid JSON
+        yield b"["
+        first = True
+        batch = first_batch
+        try:
+            while batch is not None:
+                requests, tx_responses = batch
+                for request, tx_response in zip(requests, tx_responses):
+                    tx = tx_response.get("result")
+                    if not tx:
+                        continue
+                    signature_info = signatures[request["id"]]
+                    try:
+                        transaction = parse_transaction(
+                            signature_info, tx, public_key
+                        )
+                    except Exception:
+                        logger.exception(
+                            f"Skipping unparsable transaction "
+                            f"{signature_info.signature}"
+                        )
+                        continue
+                    separator = b"" if first else b","
+                    first = False
+                    yield separator + orjson.dumps(transaction.model_dump())
+                batch = await anext(batches, None)
+        finally:
+            # Cancel outstanding batch requests if the client disconnects
+            await batches.aclose()
+        yield b"]"
+
+    return StreamingResponse(
+        stream_transactions(), media_type="application/json"
+    )
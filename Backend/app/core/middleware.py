@@ -0,0 +1,53 @@
+from time import perf_counter
+from typing import Tuple
+
+from fastapi.middleware.gzip import GZipMiddleware
+
+
+class TimingMiddleware:
+    """Pure ASGI middleware adding an ``x-response-time`` header,
+    without the response buffering of ``BaseHTTPMiddleware``"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                elapsed = (perf_counter() - start) * 1000
+                headers = list(message.get("headers", []))
+                headers.append(
+                    (b"x-response-time", f"{elapsed:.2f}ms".encode())
+                )
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class SelectiveGZipMiddleware:
+    """``GZipMiddleware`` that passes responses for paths ending in
+    ``exclude_suffixes`` through uncompressed, since gzip buffers
+    streamed bodies until enough output has accumulated"""
+
+    def __init__(
+            self, app, minimum_size: int = 500,
+            exclude_suffixes: Tuple[str, ...] = ()
+    ):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+        self.exclude_suffixes = exclude_suffixes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and \
+                scope["path"].rstrip("/").endswith(self.exclude_suffixes):
+            await self.app(scope, receive, send)
+            return
+
+        await self.gzip(scope, receive, send)
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from typing import AsyncIterator, List, Tuple
+
+import orjson
+
+from .rpc_http import http_client
+
+
+logger = logging.getLogger(__name__)
+
+
+# Max requests per batch payload and batch payloads in flight at once
+RPC_BATCH_SIZE = 10
+RPC_BATCH_CONCURRENCY = 10
+_batch_semaphore = asyncio.Semaphore(RPC_BATCH_CONCURRENCY)
+
+
+def rpc_request(request_id: int, method: str, params: list) -> dict:
+    """Build a single JSON-RPC 2.0 request object"""
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": method,
+        "params": params
+    }
+
+
+async def post_batch(requests: List[dict]) -> List[dict]:
+    """Post one JSON-RPC batch payload and return the responses
+    in the same order as the requests, matched by their ``id``"""
+    async with _batch_semaphore:
+        response = await http_client.post(
+            "",
+            json=requests,
+            headers={"Content-Type": "application/json"}
+        )
+    response.raise_for_status()
+
+    payload = orjson.loads(response.content)
+    # Nodes that reject or limit batches reply with a single error object
+    if not isinstance(payload, list):
+        error = payload.get("error") if isinstance(payload, dict) else None
+        message = error.get("message") if isinstance(error, dict) else error
+        raise RuntimeError(
+            f"RPC batch request failed: {message or repr(payload)}"
+        )
+
+    by_id = {}
+    for item in payload:
+        if "error" in item:
+            logger.warning(
+                f"RPC request {item.get('id')} failed: {item['error']}"
+            )
+        by_id[item.get("id")] = item
+    return [by_id.get(request["id"], {}) for request in requests]
+
+
+async def rpc_batch(
+        requests: List[dict], batch_size: int = RPC_BATCH_SIZE
+) -> List[dict]:
+    """Send JSON-RPC requests as concurrent batches of ``batch_size``
+    and return the responses in the same order as the requests"""
+    if not requests:
+        return []
+
+    chunks = [
+        requests[i:i + batch_size]
+        for i in range(0, len(requests), batch_size)
+    ]
+    results = await asyncio.gather(*[post_batch(chunk) for chunk in chunks])
+    return [item for chunk in results for item in chunk]
+
+
+async def rpc_batch_stream(
+        requests: List[dict], batch_size: int = RPC_BATCH_SIZE
+) -> AsyncIterator[Tuple[List[dict], List[dict]]]:
+    """Send JSON-RPC requests like ``rpc_batch`` but yield each
+    ``(requests, responses)`` batch as soon as it and all earlier
+    batches have resolved"""
+    chunks = [
+        requests[i:i + batch_size]
+        for i in range(0, len(requests), batch_size)
+    ]
+    tasks = [asyncio.ensure_future(post_batch(chunk)) for chunk in chunks]
+    try:
+        for chunk, task in zip(chunks, tasks):
+            yield chunk, await task
+    finally:
+        for task in tasks:
+            task.cancel()
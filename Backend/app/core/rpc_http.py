@@ -0,0 +1,15 @@
+import httpx
+
+from .config import SOLANA_API_ENDPOINT
+
+
+# Shared HTTP/2 client for all JSON-RPC traffic to the Solana endpoint
+http_client = httpx.AsyncClient(
+    base_url=SOLANA_API_ENDPOINT,
+    http2=True,
+    timeout=120.0,
+    limits=httpx.Limits(
+        max_keepalive_connections=50,
+        max_connections=100
+    )
+)
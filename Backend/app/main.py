@@ -1,11 +1,27 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
 from SolAppp.Backend.app.api import api_router
+from SolAppp.Backend.app.core.middleware import (
+    SelectiveGZipMiddleware, TimingMiddleware
+)
 
-app = FastAPI(title="Solana Blockchain Integration Service")
+app = FastAPI(
+    title="Solana Blockchain Integration Service",
+    default_response_class=ORJSONResponse
+)
 
 app.include_router(api_router)
 
+# Compress larger JSON payloads except the streamed transaction history,
+# time the full response including gzip
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    minimum_size=1024,
+    exclude_suffixes=("/transactions",)
+)
+app.add_middleware(TimingMiddleware)
+
 
 # Run the application
 if __name__ == "__main__":
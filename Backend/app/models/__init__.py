@@ -24,7 +24,7 @@ class CustomToken(BaseModel):
 
 class Transaction(BaseModel):
     signature: str
-    timestamp: datetime
+    timestamp: Optional[datetime]
     type: str  # 'send' or 'receive'
     amount: float
     token_symbol: str
@@ -34,7 +34,7 @@ class Transaction(BaseModel):
 
 
 class TokenBalance(BaseModel):
-    symbol: str
+    address: str
     balance: float
     usd_value: Optional[float]
 
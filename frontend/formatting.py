@@ -0,0 +1,38 @@
+"""Formatting helpers for the Streamlit frontend.
+
+Kept out of main.py because Streamlit re-executes the script on every
+rerun, which would reset these caches; imported modules persist.
+"""
+from datetime import datetime
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def format_address(address: str, length: int = 8) -> str:
+    """Format address to show beginning and end with ellipsis.
+    Solana pubkeys (32-44 chars) and signatures (87-88 chars) are always
+    longer than the two shown halves, so no length check is needed."""
+    return f"{address[:length]}...{address[-length:]}"
+
+
+@lru_cache(maxsize=2048)
+def format_timestamp(timestamp: str) -> str:
+    """Format timestamp to readable date"""
+    if not timestamp:
+        return "Unknown time"
+    # ISO timestamps already start with the wanted "YYYY-MM-DDTHH:MM:SS"
+    if len(timestamp) >= 19 and timestamp[10] == 'T':
+        return timestamp[:19].replace('T', ' ')
+    dt = datetime.fromisoformat(timestamp)
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+@lru_cache(maxsize=2048)
+def format_transaction_html(amount, token_symbol, tx_type, status):
+    """Render colored amount and status spans for a transaction"""
+    amount_color = "green" if tx_type == "receive" else "red"
+    status_color = "green" if status == "confirmed" else "orange"
+    return (
+        f"<span style='color: {amount_color}'>{amount} {token_symbol}</span>",
+        f"<span style='color: {status_color}'>{status.title()}</span>"
+    )
@@ -1,11 +1,30 @@
 import streamlit as st
-import requests
-from datetime import datetime
-import json
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import logging
+import queue
+import sqlite3
 import hashlib
 from pathlib import Path
 import secrets
 
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    from json import dumps as json_dumps, loads as json_loads
+
+# Relative when imported as a package, plain under `streamlit run`
+try:
+    from .formatting import (
+        format_address, format_timestamp, format_transaction_html
+    )
+except ImportError:
+    from formatting import (
+        format_address, format_timestamp, format_transaction_html
+    )
+
 # Configure page
 st.set_page_config(
     page_title="Solana Wallet Manager",
@@ -13,31 +32,73 @@ st.set_page_config(
     layout="wide"
 )
 
+logger = logging.getLogger(__name__)
+
 # Backend API URL
 API_URL = "http://localhost:8000"
 
+# Request timeouts in seconds, on-chain operations wait for confirmation
+# and trending tokens scan recent blocks on a cold cache
+REQUEST_TIMEOUT = 5
+TRENDING_TIMEOUT = 30
+TRANSACTION_TIMEOUT = 120
+
+# Default transaction history page size, also prefetched by the overview
+TRANSACTION_PAGE_SIZE = 10
+
+# Longest wait in seconds between retries of a failed wallet write
+WRITE_RETRY_MAX_DELAY = 30
+
+
+@st.cache_resource
+def get_http():
+    """Pooled HTTP client shared across reruns, so API calls reuse
+    keep-alive connections (multiplexed when the API is served over TLS)"""
+    # Imported lazily, first needed once a wallet is created or opened
+    import httpx
+
+    return httpx.Client(
+        base_url=API_URL,
+        timeout=REQUEST_TIMEOUT,
+        transport=httpx.HTTPTransport(
+            http2=True,
+            retries=2,
+            limits=httpx.Limits(max_keepalive_connections=10)
+        )
+    )
+
 
 def generate_private_key():
     """Generate a random private key"""
-    return secrets.token_hex(32)
+    return secrets.token_bytes(32).hex()
 
 
 def hash_private_key(private_key):
-    """Hash private key for storage"""
-    return hashlib.sha256(private_key.encode()).hexdigest()
+    """Hash private key for storage, accepts str or raw bytes"""
+    data = private_key if isinstance(private_key, bytes) \
+        else private_key.encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+def with_script_ctx(func):
+    """Wrap a helper so it can call Streamlit from a worker thread"""
+    ctx = get_script_run_ctx()
+
+    def run(*args, **kwargs):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return func(*args, **kwargs)
+    return run
 
 
-def format_address(address: str, length: int = 8) -> str:
-    """Format address to show beginning and end with ellipsis"""
-    if len(address) <= length * 2:
-        return address
-    return f"{address[:length]}...{address[-length:]}"
+@st.cache_resource
+def get_executor():
+    """Shared thread pool for concurrent backend calls"""
+    return ThreadPoolExecutor(max_workers=4)
 
 
-def format_timestamp(timestamp: str) -> str:
-    """Format timestamp to readable date"""
-    dt = datetime.fromisoformat(timestamp)
-    return dt.strftime("%Y-%m-%d %H:%M:%S")
+def submit(func, *args, **kwargs):
+    """Run a fetch helper on the shared thread pool"""
+    return get_executor().submit(with_script_ctx(func), *args, **kwargs)
 
 
 def init_session_state():
@@ -46,44 +107,144 @@ def init_session_state():
         st.session_state.authenticated = False
     if 'current_private_key' not in st.session_state:
         st.session_state.current_private_key = None
-    if 'my_wallets' not in st.session_state:
-        st.session_state.my_wallets = {}
+    if 'active_wallet' not in st.session_state:
+        st.session_state.active_wallet = None
     if 'show_private_key' not in st.session_state:
         st.session_state.show_private_key = False
     if 'new_wallet_data' not in st.session_state:
         st.session_state.new_wallet_data = None
     if 'current_page' not in st.session_state:
         st.session_state.current_page = "Wallets"
+    if 'tx_cursors' not in st.session_state:
+        st.session_state.tx_cursors = [None]
 
 
 def get_storage_path():
     """Get storage path for wallet data"""
     storage_dir = Path("wallet_data")
     storage_dir.mkdir(exist_ok=True)
-    return storage_dir / "wallets.json"
+    return storage_dir / "wallets.db"
 
 
-def load_stored_data():
-    """Load stored wallet data"""
+@st.cache_resource
+def get_db():
+    """Open the SQLite wallet store once per process"""
     storage_path = get_storage_path()
+    db = sqlite3.connect(
+        storage_path, isolation_level=None, check_same_thread=False
+    )
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS wallets "
+        "(hashed_key TEXT PRIMARY KEY, blob BLOB)"
+    )
+
+    # Import wallets saved by the previous JSON file storage
+    legacy_path = storage_path.with_name("wallets.json")
+    if (
+            legacy_path.exists() and
+            not db.execute("SELECT 1 FROM wallets LIMIT 1").fetchone()
+    ):
+        with open(legacy_path, 'rb') as f:
+            legacy_wallets = json_loads(f.read())
+        write_rows(
+            db,
+            [(key, json_dumps(wallet)) for key, wallet in legacy_wallets.items()]
+        )
+    return db
+
+
+@st.cache_resource
+def get_db_lock():
+    """Lock serializing access to the shared SQLite connection"""
+    return threading.Lock()
+
+
+@st.cache_resource
+def get_pending_writes():
+    """Wallets queued for saving but not yet written to the store"""
+    return {}
+
+
+def write_rows(db, rows):
+    """Upsert wallet rows in a single SQLite transaction, so all rows
+    land together with one sync"""
+    db.execute("BEGIN IMMEDIATE")
     try:
-        if storage_path.exists():
-            with open(storage_path, 'r') as f:
-                return json.load(f)
-        return {}
+        db.executemany(
+            "INSERT OR REPLACE INTO wallets (hashed_key, blob) VALUES (?, ?)",
+            rows
+        )
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+
+
+@st.cache_resource
+def get_write_queue():
+    """Queue of wallet writes drained by a background daemon thread"""
+    write_queue = queue.Queue()
+    db, db_lock, pending = get_db(), get_db_lock(), get_pending_writes()
+
+    def drain():
+        delay = 0
+        while True:
+            data = write_queue.get()
+            with db_lock:
+                # Skip wallets superseded by a newer queued write
+                data = {
+                    key: wallet for key, wallet in data.items()
+                    if pending.get(key) is wallet
+                }
+                if not data:
+                    continue
+                try:
+                    write_rows(
+                        db,
+                        [(key, json_dumps(wallet))
+                         for key, wallet in data.items()]
+                    )
+                except Exception:
+                    logger.exception("Error saving wallet data, retrying")
+                else:
+                    for key in data:
+                        del pending[key]
+                    delay = 0
+                    continue
+            # Failed writes stay pending, so they remain loadable, and are
+            # retried with exponential backoff
+            delay = min(max(delay * 2, 1), WRITE_RETRY_MAX_DELAY)
+            time.sleep(delay)
+            write_queue.put(data)
+
+    threading.Thread(target=drain, name="wallet-writer", daemon=True).start()
+    return write_queue
+
+
+def load_wallet(hashed_key):
+    """Load a single stored wallet by its hashed private key"""
+    try:
+        with get_db_lock():
+            wallet = get_pending_writes().get(hashed_key)
+            if wallet:
+                return wallet
+            row = get_db().execute(
+                "SELECT blob FROM wallets WHERE hashed_key = ?", (hashed_key,)
+            ).fetchone()
+        return json_loads(row[0]) if row else None
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
-        return {}
+        return None
 
 
 def save_data(data):
-    """Save wallet data"""
-    storage_path = get_storage_path()
-    try:
-        with open(storage_path, 'w') as f:
-            json.dump(data, f)
-    except Exception as e:
-        st.error(f"Error saving data: {str(e)}")
+    """Queue changed wallet data, keyed by hashed private key, for saving
+    off the UI thread. Queued wallets are visible to load_wallet at once."""
+    with get_db_lock():
+        get_pending_writes().update(data)
+    get_write_queue().put(data)
 
 
 def verify_private_key(private_key):
@@ -92,25 +253,51 @@ def verify_private_key(private_key):
         return False
 
     hashed_key = hash_private_key(private_key)
-    all_wallets = load_stored_data()
+    wallet = load_wallet(hashed_key)
 
-    if hashed_key in all_wallets:
+    if wallet:
         st.session_state.authenticated = True
         st.session_state.current_private_key = private_key
-        st.session_state.my_wallets = {
-            all_wallets[hashed_key]["name"]: all_wallets[hashed_key]
-        }
+        st.session_state.active_wallet = wallet
         return True
     return False
 
 
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_wallet_balance(public_key):
+    """Fetch wallet balance, raising on failure so errors are not cached"""
+    response = get_http().get(f"/wallets/{public_key}/balance")
+    response.raise_for_status()
+    return json_loads(response.content)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_wallet_transactions(public_key, limit=10, before=None):
+    """Fetch wallet transactions, raising on failure so errors are not
+    cached"""
+    params = {"limit": limit}
+    if before:
+        params["before"] = before
+    response = get_http().get(
+        f"/wallets/{public_key}/transactions",
+        params=params
+    )
+    response.raise_for_status()
+    return json_loads(response.content)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_trending_tokens():
+    """Fetch trending tokens, raising on failure so errors are not cached"""
+    response = get_http().get("/tokens/trending", timeout=TRENDING_TIMEOUT)
+    response.raise_for_status()
+    return json_loads(response.content)
+
+
 def get_wallet_balance(public_key):
     """Fetch wallet balance"""
     try:
-        response = requests.get(f"{API_URL}/wallets/{public_key}/balance")
-        if response.status_code == 200:
-            return response.json()
-        return None
+        return fetch_wallet_balance(public_key)
     except Exception as e:
         st.error(f"Error fetching balance: {str(e)}")
         return None
@@ -119,16 +306,9 @@ def get_wallet_balance(public_key):
 def get_wallet_transactions(public_key, limit=10, before=None):
     """Fetch wallet transactions"""
     try:
-        params = {"limit": limit}
-        if before:
-            params["before"] = before
-        response = requests.get(
-            f"{API_URL}/wallets/{public_key}/transactions",
-            params=params
+        return fetch_wallet_transactions(
+            public_key, limit=limit, before=before
         )
-        if response.status_code == 200:
-            return response.json()
-        return []
     except Exception as e:
         st.error(f"Error fetching transactions: {str(e)}")
         return []
@@ -137,10 +317,7 @@ def get_wallet_transactions(public_key, limit=10, before=None):
 def get_trending_tokens():
     """Fetch trending tokens"""
     try:
-        response = requests.get(f"{API_URL}/tokens/trending")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return fetch_trending_tokens()
     except Exception as e:
         st.error(f"Error fetching tokens: {str(e)}")
         return []
@@ -149,13 +326,16 @@ def get_trending_tokens():
 def add_token_to_wallet(wallet_public_key, token_address):
     """Add token to wallet"""
     try:
-        response = requests.post(
-            f"{API_URL}/wallets/{wallet_public_key}/tokens",
-            params={"token_address": token_address}
+        response = get_http().post(
+            f"/wallets/{wallet_public_key}/tokens",
+            params={"token_address": token_address},
+            timeout=TRANSACTION_TIMEOUT
         )
         if response.status_code == 200:
+            # New token account changes the wallet's balances
+            fetch_wallet_balance.clear()
             st.success("Token added successfully!")
-            return response.json()
+            return json_loads(response.content)
         else:
             st.error(f"Error adding token: {response.text}")
     except Exception as e:
@@ -165,18 +345,19 @@ def add_token_to_wallet(wallet_public_key, token_address):
 def create_custom_token(name, symbol, decimals, total_supply):
     """Create custom token"""
     try:
-        response = requests.post(
-            f"{API_URL}/tokens/custom",
+        response = get_http().post(
+            "/tokens/custom",
             json={
                 "name": name,
                 "symbol": symbol,
                 "decimals": decimals,
                 "total_supply": total_supply
-            }
+            },
+            timeout=TRANSACTION_TIMEOUT
         )
         if response.status_code == 200:
             st.success("Custom token created successfully!")
-            return response.json()
+            return json_loads(response.content)
         else:
             st.error(f"Error creating token: {response.text}")
     except Exception as e:
@@ -186,12 +367,12 @@ def create_custom_token(name, symbol, decimals, total_supply):
 def create_wallet(name):
     """Create a new wallet"""
     try:
-        response = requests.post(
-            f"{API_URL}/wallets/wallet",
+        response = get_http().post(
+            "/wallets/wallet",
             json={"name": name}
         )
         if response.status_code == 200:
-            data = response.json()
+            data = json_loads(response.content)
 
             # Generate private key
             private_key = generate_private_key()
@@ -204,14 +385,12 @@ def create_wallet(name):
             }
 
             # Store the wallet data
-            all_wallets = load_stored_data()
-            all_wallets[hashed_key] = wallet_data
-            save_data(all_wallets)
+            save_data({hashed_key: wallet_data})
 
             # Set the session state to show private key
             st.session_state.authenticated = True
             st.session_state.current_private_key = private_key
-            st.session_state.my_wallets = {name: wallet_data}
+            st.session_state.active_wallet = wallet_data
             st.session_state.show_private_key = True
             st.session_state.new_wallet_data = {
                 "wallet": wallet_data,
@@ -279,7 +458,16 @@ def show_new_wallet_notice():
 
 def render_wallet_overview():
     """Render wallet overview page"""
-    wallet = list(st.session_state.my_wallets.values())[0]
+    wallet = st.session_state.active_wallet
+
+    # Fetch balance and recent transactions in parallel, using the same
+    # arguments as the first history page so it is already cached
+    balance_future = submit(get_wallet_balance, wallet['public_key'])
+    transactions_future = submit(
+        get_wallet_transactions, wallet['public_key'],
+        limit=TRANSACTION_PAGE_SIZE, before=None
+    )
+
     st.header(f"Wallet: {wallet['name']}")
 
     # Display wallet information
@@ -288,8 +476,8 @@ def render_wallet_overview():
         st.markdown("**Public Key**")
         st.code(wallet['public_key'])
 
-    # Get and display balance
-    balance = get_wallet_balance(wallet['public_key'])
+    # Display balance
+    balance = balance_future.result()
     if balance:
         with col2:
             st.metric("SOL Balance", f"{balance['sol_balance']:.4f} SOL")
@@ -300,23 +488,83 @@ def render_wallet_overview():
             st.subheader("Token Balances")
             for token in balance['tokens']:
                 st.metric(
-                    token['symbol'],
+                    format_address(token['address']),
                     f"{token['balance']:.4f}",
                     f"${token['usd_value']:.2f}" if token['usd_value'] else None
                 )
 
+    # Display recent activity
+    transactions = transactions_future.result()
+    if transactions:
+        st.subheader("Recent Transactions")
+        for tx in transactions[:5]:
+            st.write(
+                f"{format_timestamp(tx['timestamp'])} · {tx['type'].title()} "
+                f"{tx['amount']} {tx['token_symbol']}"
+            )
+
 
+@st.fragment
 def render_transactions():
     """Render transactions page"""
-    wallet = list(st.session_state.my_wallets.values())[0]
+    wallet = st.session_state.active_wallet
     st.header("Transaction History")
 
-    transaction_limit = st.slider("Number of transactions", 5, 50, 10)
-    transactions = get_wallet_transactions(wallet['public_key'], limit=transaction_limit)
+    transaction_limit = st.slider(
+        "Number of transactions", 5, 50, TRANSACTION_PAGE_SIZE
+    )
+
+    # Fetch one page at a time, older pages start before a signature
+    cursors = st.session_state.tx_cursors
+    transactions = get_wallet_transactions(
+        wallet['public_key'], limit=transaction_limit, before=cursors[-1]
+    )
 
     if transactions:
-        for tx in transactions:
-            with st.expander(f"Transaction: {format_address(tx['signature'])}"):
+        import pandas as pd
+
+        # One table for the whole history instead of a widget tree per row.
+        # Raw values go in as-is, the grid formats only the visible cells.
+        table = pd.DataFrame(transactions, columns=[
+            "signature", "type", "amount", "token_symbol",
+            "status", "timestamp", "from_address", "to_address"
+        ])
+        table["timestamp"] = pd.to_datetime(table["timestamp"])
+        event = st.dataframe(
+            table,
+            width="stretch",
+            hide_index=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            column_config={
+                "signature": st.column_config.TextColumn(
+                    "Signature", width="small"
+                ),
+                "type": "Type",
+                "amount": st.column_config.NumberColumn(
+                    "Amount", format="%.4f"
+                ),
+                "token_symbol": "Token",
+                "status": "Status",
+                "timestamp": st.column_config.DatetimeColumn(
+                    "Time", format="YYYY-MM-DD HH:mm:ss"
+                ),
+                "from_address": st.column_config.TextColumn(
+                    "From", width="small"
+                ),
+                "to_address": st.column_config.TextColumn(
+                    "To", width="small"
+                )
+            }
+        )
+
+        # Show details for the selected transaction only
+        if event.selection.rows:
+            tx = transactions[event.selection.rows[0]]
+            with st.expander(
+                    f"Transaction: {format_address(tx['signature'])}",
+                    expanded=True
+            ):
                 cols = st.columns([2, 1, 1])
                 with cols[0]:
                     st.markdown("**Type**")
@@ -324,20 +572,14 @@ def render_transactions():
                     st.markdown("**Time**")
                     st.write(format_timestamp(tx['timestamp']))
 
+                amount_html, status_html = format_transaction_html(
+                    tx['amount'], tx['token_symbol'], tx['type'], tx['status']
+                )
                 with cols[1]:
                     st.markdown("**Amount**")
-                    amount_color = "green" if tx['type'] == "receive" else "red"
-                    st.markdown(
-                        f"<span style='color: {amount_color}'>{tx['amount']} "
-                        f"{tx['token_symbol']}</span>",
-                        unsafe_allow_html=True
-                    )
+                    st.markdown(amount_html, unsafe_allow_html=True)
                     st.markdown("**Status**")
-                    status_color = "green" if tx['status'] == "confirmed" else "orange"
-                    st.markdown(
-                        f"<span style='color: {status_color}'>{tx['status'].title()}</span>",
-                        unsafe_allow_html=True
-                    )
+                    st.markdown(status_html, unsafe_allow_html=True)
 
                 with cols[2]:
                     st.markdown("**From**")
@@ -347,15 +589,33 @@ def render_transactions():
     else:
         st.info("No transactions found")
 
+    col_newer, col_older = st.columns(2)
+    with col_newer:
+        if st.button("Newer", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun(scope="fragment")
+    with col_older:
+        # The backend skips unparsable transactions, so a short page does
+        # not mean the history has ended, only an empty one does
+        if st.button("Older", disabled=not transactions):
+            cursors.append(transactions[-1]['signature'])
+            st.rerun(scope="fragment")
+
 
+@st.fragment
 def render_tokens():
     """Render tokens page"""
-    wallet = list(st.session_state.my_wallets.values())[0]
+    wallet = st.session_state.active_wallet
+
+    # Fetch wallet balance in parallel with trending tokens
+    balance_future = submit(get_wallet_balance, wallet['public_key'])
+
     st.header("Manage Tokens")
 
     # Display trending tokens
     st.subheader("Trending Tokens")
     tokens = get_trending_tokens()
+    token_added = False
 
     if tokens:
         for token in tokens:
@@ -368,10 +628,25 @@ def render_tokens():
                 st.write(f"${token['price']:.2f}")
             with col3:
                 if st.button("Add Token", key=token['address']):
-                    add_token_to_wallet(wallet['public_key'], token['address'])
+                    if add_token_to_wallet(
+                            wallet['public_key'], token['address']
+                    ):
+                        token_added = True
     else:
         st.info("No trending tokens available")
 
+    # Display tokens already held by the wallet, refetched once an added
+    # token has cleared the cached balance
+    balance = balance_future.result()
+    if token_added:
+        balance = get_wallet_balance(wallet['public_key'])
+    if balance and balance['tokens']:
+        st.subheader("Your Tokens")
+        for token in balance['tokens']:
+            st.write(
+                f"`{format_address(token['address'])}` · {token['balance']:.4f}"
+            )
+
 
 def render_create_token():
     """Render create token page"""
@@ -410,9 +685,12 @@ def main():
 
         # Logout button
         if st.sidebar.button("Logout"):
+            fetch_wallet_balance.clear()
+            fetch_wallet_transactions.clear()
             st.session_state.authenticated = False
             st.session_state.current_private_key = None
-            st.session_state.my_wallets = {}
+            st.session_state.active_wallet = None
+            st.session_state.tx_cursors = [None]
             st.rerun()
 
         # Render selected page